@@ -3,10 +3,12 @@ FastAPI endpoint for Grokipedia search suggestions
 Returns autocomplete suggestions from Grokipedia search
 """
 
-from fastapi import FastAPI, HTTPException, Body
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, Body, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
+import httpx
+from cachetools import TTLCache
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -14,11 +16,15 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
+import asyncio
+import json
 import time
 import logging
 import os
 import subprocess
 import shutil
+from contextlib import asynccontextmanager
+from functools import lru_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,12 +33,69 @@ logger = logging.getLogger(__name__)
 # Try to import webdriver-manager for automatic ChromeDriver management
 try:
     from webdriver_manager.chrome import ChromeDriverManager
-    from selenium.webdriver.chrome.service import Service as ChromeService
     WEBDRIVER_MANAGER_AVAILABLE = True
 except ImportError:
     WEBDRIVER_MANAGER_AVAILABLE = False
     logger.warning("webdriver-manager not available. Install with: pip install webdriver-manager")
 
+# Try to import Playwright for the async browser fallback. One Chromium
+# process multiplexes many pages over a single CDP websocket, so it serves
+# concurrent scrapes without a thread (or a Chrome) per request.
+try:
+    from playwright.async_api import async_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+    logger.warning("playwright not available. Install with: pip install playwright")
+
+# Grokipedia's search box hits this XHR endpoint directly; calling it avoids
+# launching a browser at all (captured from the site's devtools network tab)
+GROKIPEDIA_SEARCH_URL = "https://grokipedia.com/api/search"
+GROKIPEDIA_SEARCH_PARAMS = {"limit": "10"}
+GROKIPEDIA_SEARCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/json",
+    "Referer": "https://grokipedia.com/",
+}
+HTTP_TIMEOUT_SECONDS = 5
+
+# Autocomplete traffic is heavily Zipfian, so a short-TTL cache on the hot
+# query set eliminates most of the upstream work
+SUGGESTION_CACHE_TTL_SECONDS = 300
+SUGGESTION_CACHE_MAXSIZE = 10_000
+
+# Number of pre-warmed Chrome drivers kept in the fallback pool
+BROWSER_POOL_SIZE = int(os.environ.get("BROWSER_POOL_SIZE", "2"))
+
+# Candidate selectors for suggestion elements, comma-joined so one DOM
+# query covers them all
+SUGGESTION_SELECTORS = [
+    "div[class*='cursor-pointer'] span",
+    "div.cursor-pointer span",
+    "[role='option']",
+    "div[class*='search'] div[class*='result']",
+    "div[class*='suggestion']",
+    "div[class*='autocomplete'] span",
+    "ul[class*='suggestions'] li",
+    "div[class*='dropdown'] div"
+]
+
+# Joined once at import instead of per request
+COMBINED_SELECTOR = ",".join(SUGGESTION_SELECTORS)
+
+# Cheap early signal that suggestions have rendered
+SUGGESTION_WAIT_SELECTOR = "div[class*='cursor-pointer'] span, [role='option']"
+
+# Resources the scraper never needs: the page is only loaded to type into a
+# text input, so images, fonts, styling and analytics are pure overhead
+BLOCKED_RESOURCE_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.ico",
+    "*.woff", "*.woff2", "*.ttf",
+    "*.css", "*.svg",
+    "*.mp4", "*.webm",
+    "*/analytics*", "*/gtag*", "*/gtm.js*",
+]
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Grokipedia Search Suggestions API",
@@ -55,14 +118,20 @@ class SuggestionResponse(BaseModel):
     status: str
 
 
+@lru_cache(maxsize=1)
 def get_chromedriver_path():
-    """Find ChromeDriver path, checking common locations for Cloud Run"""
+    """
+    Find ChromeDriver path, checking common locations for Cloud Run
+
+    Cached: the path is static for the life of the container, so the
+    shutil.which plus os.path probes only run once.
+    """
     # Check if chromedriver is in PATH
     chromedriver_path = shutil.which('chromedriver')
     if chromedriver_path:
         logger.info(f"Found ChromeDriver in PATH: {chromedriver_path}")
         return chromedriver_path
-    
+
     # Check common installation paths
     common_paths = [
         '/usr/bin/chromedriver',
@@ -70,195 +139,541 @@ def get_chromedriver_path():
         '/opt/chromedriver/chromedriver',
         '/usr/lib/chromium-browser/chromedriver',
     ]
-    
+
     for path in common_paths:
         if os.path.exists(path) and os.access(path, os.X_OK):
             logger.info(f"Found ChromeDriver at: {path}")
             return path
-    
+
     logger.warning("ChromeDriver not found in common paths, Selenium will try to use webdriver-manager")
     return None
 
 
-def get_grokipedia_suggestions(query: str, headless: bool = True) -> List[str]:
+@lru_cache(maxsize=1)
+def get_chrome_binary_path():
+    """Find the Chrome/Chromium binary, checking common paths (cached once)"""
+    chrome_binary_paths = [
+        '/usr/bin/google-chrome',
+        '/usr/bin/chromium-browser',
+        '/usr/bin/chromium',
+        '/usr/local/bin/chrome',
+    ]
+
+    for binary_path in chrome_binary_paths:
+        if os.path.exists(binary_path):
+            logger.info(f"Using Chrome binary at: {binary_path}")
+            return binary_path
+
+    return None
+
+
+def parse_search_payload(payload) -> List[str]:
+    """Extract suggestion titles from the search API's JSON payload"""
+    if isinstance(payload, dict):
+        hits = payload.get("results") or payload.get("suggestions") or []
+    elif isinstance(payload, list):
+        hits = payload
+    else:
+        hits = []
+
+    suggestions = []
+    seen = set()
+    for hit in hits:
+        if isinstance(hit, dict):
+            text = hit.get("title") or hit.get("name") or ""
+        else:
+            text = str(hit)
+        text = text.strip()
+        # Set membership keeps dedup O(1) per item instead of scanning the list
+        if text and text not in seen:
+            seen.add(text)
+            suggestions.append(text)
+    return suggestions
+
+
+async def get_grokipedia_suggestions(query: str, headless: bool = True) -> List[str]:
     """
-    Search Grokipedia and get all suggestions that appear
-    
+    Get search suggestions by calling Grokipedia's suggestion API directly
+
+    This hits the same XHR endpoint the site's search box uses, so no browser
+    is needed. If the endpoint fails (e.g. it changes shape or blocks us),
+    falls back to the Selenium scraper.
+
     Args:
         query: Search term
-        headless: Run browser in headless mode (default: True)
-    
+        headless: Run browser in headless mode for the Selenium fallback
+
     Returns:
         List of suggestion texts
     """
-    driver = None
     try:
-        logger.info(f"Setting up Chrome driver for query: {query}")
-        
-        # Setup Chrome options for Cloud Run / containerized environments
-        chrome_options = Options()
-        
-        # Essential for headless mode in containers
-        if headless:
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--headless=new')  # Use new headless mode
-        
-        # Required for running in containers (Cloud Run, Docker, etc.)
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--disable-software-rasterizer')
-        chrome_options.add_argument('--disable-extensions')
-        chrome_options.add_argument('--disable-background-timer-throttling')
-        chrome_options.add_argument('--disable-backgrounding-occluded-windows')
-        chrome_options.add_argument('--disable-renderer-backgrounding')
-        chrome_options.add_argument('--disable-features=TranslateUI')
-        chrome_options.add_argument('--disable-ipc-flooding-protection')
-        
-        # Window size
-        chrome_options.add_argument('--window-size=1920,1080')
-        
-        # User agent
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-        
-        # Binary location (check common Chrome/Chromium paths)
-        chrome_binary_paths = [
-            '/usr/bin/google-chrome',
-            '/usr/bin/chromium-browser',
-            '/usr/bin/chromium',
-            '/usr/local/bin/chrome',
-        ]
-        
-        for binary_path in chrome_binary_paths:
-            if os.path.exists(binary_path):
-                chrome_options.binary_location = binary_path
-                logger.info(f"Using Chrome binary at: {binary_path}")
-                break
-        
-        # Try to find ChromeDriver
-        chromedriver_path = get_chromedriver_path()
-        
-        # Create service with ChromeDriver
-        if chromedriver_path:
-            # Use found ChromeDriver
-            service = Service(chromedriver_path)
-            driver = webdriver.Chrome(service=service, options=chrome_options)
-            logger.info(f"Using ChromeDriver from: {chromedriver_path}")
-        elif WEBDRIVER_MANAGER_AVAILABLE:
-            # Use webdriver-manager to automatically download and manage ChromeDriver
+        logger.info(f"Fetching suggestions from search API for query: {query}")
+        async with httpx.AsyncClient(timeout=HTTP_TIMEOUT_SECONDS) as client:
+            response = await client.get(
+                GROKIPEDIA_SEARCH_URL,
+                params={"q": query, **GROKIPEDIA_SEARCH_PARAMS},
+                headers=GROKIPEDIA_SEARCH_HEADERS,
+            )
+            response.raise_for_status()
+            suggestions = parse_search_payload(response.json())
+
+        if suggestions:
+            logger.info(f"Search API returned {len(suggestions)} suggestions")
+            return suggestions
+        logger.warning("Search API returned no suggestions, falling back to browser scrape")
+    except Exception as e:
+        logger.warning(f"Search API request failed ({e}), falling back to browser scrape")
+
+    return await scrape_grokipedia_suggestions(query, headless=headless)
+
+
+@lru_cache(maxsize=2)
+def build_chrome_options(headless: bool = True) -> Options:
+    """
+    Build Chrome options for Cloud Run / containerized environments
+
+    Cached per headless mode: the flag set never changes at runtime, so
+    every pooled driver launches with an identical configuration.
+
+    Args:
+        headless: Run browser in headless mode (default: True)
+
+    Returns:
+        A configured Options instance
+    """
+    chrome_options = Options()
+
+    # Return from driver.get as soon as the DOM is parsed instead of waiting
+    # for every subresource; the explicit wait on the search input takes over
+    # from there
+    chrome_options.page_load_strategy = 'eager'
+
+    # Essential for headless mode in containers
+    if headless:
+        chrome_options.add_argument('--headless')
+        chrome_options.add_argument('--headless=new')  # Use new headless mode
+
+    # Required for running in containers (Cloud Run, Docker, etc.)
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--disable-software-rasterizer')
+    chrome_options.add_argument('--disable-extensions')
+    chrome_options.add_argument('--disable-background-timer-throttling')
+    chrome_options.add_argument('--disable-backgrounding-occluded-windows')
+    chrome_options.add_argument('--disable-renderer-backgrounding')
+    # Chrome only honours the last --disable-features switch, so keep the
+    # full list in one argument
+    chrome_options.add_argument('--disable-features=TranslateUI,site-per-process,IsolateOrigins,BlinkGenPropertyTrees')
+    chrome_options.add_argument('--disable-ipc-flooding-protection')
+
+    # Minimum-RAM switches for small containers: collapse Chrome's 5-8
+    # processes into one and cap the JS heap
+    chrome_options.add_argument('--single-process')
+    chrome_options.add_argument('--no-zygote')
+    chrome_options.add_argument('--renderer-process-limit=1')
+    chrome_options.add_argument('--js-flags=--max-old-space-size=256')
+
+    # Subsystems a scrape-only browser never needs
+    chrome_options.add_argument('--disable-hang-monitor')
+    chrome_options.add_argument('--mute-audio')
+    chrome_options.add_argument('--disable-client-side-phishing-detection')
+    chrome_options.add_argument('--disable-accelerated-2d-canvas')
+    chrome_options.add_argument('--disable-breakpad')
+
+    # Window size
+    chrome_options.add_argument('--window-size=1920,1080')
+
+    # User agent
+    chrome_options.add_argument('--user-agent=Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+
+    # Don't load images at all (belt-and-braces with the CDP URL blocking below)
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2
+    })
+
+    # Binary location (cached lookup over common Chrome/Chromium paths)
+    chrome_binary = get_chrome_binary_path()
+    if chrome_binary:
+        chrome_options.binary_location = chrome_binary
+
+    return chrome_options
+
+
+def create_chrome_driver(headless: bool = True):
+    """
+    Launch a Chrome driver configured for Cloud Run / containerized environments
+
+    Args:
+        headless: Run browser in headless mode (default: True)
+
+    Returns:
+        A ready-to-use Chrome WebDriver instance
+    """
+    chrome_options = build_chrome_options(headless)
+
+    # Try to find ChromeDriver
+    chromedriver_path = get_chromedriver_path()
+
+    # Create service with ChromeDriver
+    if chromedriver_path:
+        # Use found ChromeDriver
+        service = Service(chromedriver_path)
+        driver = webdriver.Chrome(service=service, options=chrome_options, keep_alive=True)
+        logger.info(f"Using ChromeDriver from: {chromedriver_path}")
+    elif WEBDRIVER_MANAGER_AVAILABLE:
+        # Use webdriver-manager to automatically download and manage ChromeDriver
+        try:
+            service = Service(ChromeDriverManager().install())
+            driver = webdriver.Chrome(service=service, options=chrome_options, keep_alive=True)
+            logger.info("Using webdriver-manager for ChromeDriver")
+        except Exception as e:
+            logger.error(f"webdriver-manager failed: {e}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to setup ChromeDriver with webdriver-manager: {str(e)}"
+            )
+    else:
+        # Fallback: Let Selenium try to find ChromeDriver automatically
+        try:
+            driver = webdriver.Chrome(options=chrome_options, keep_alive=True)
+            logger.info("Using Selenium's automatic ChromeDriver detection")
+        except Exception as e:
+            logger.error(f"Failed to create Chrome driver: {e}")
+            error_msg = (
+                "ChromeDriver not found. Solutions:\n"
+                "1. Install ChromeDriver: apt-get install chromium-chromedriver\n"
+                "2. Install webdriver-manager: pip install webdriver-manager\n"
+                "3. Add ChromeDriver to PATH\n"
+                f"Error: {str(e)}"
+            )
+            raise HTTPException(
+                status_code=500,
+                detail=error_msg
+            )
+
+    # Block images, fonts, CSS, media and analytics via CDP so page loads
+    # only fetch the HTML and scripts the search box actually needs
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_RESOURCE_URLS})
+    except Exception as e:
+        logger.warning(f"Could not set up CDP resource blocking: {e}")
+
+    return driver
+
+
+class BrowserPool:
+    """
+    Bounded pool of pre-warmed headless Chrome drivers
+
+    Launching Chrome costs 1-3 s, so paying it per request serializes the
+    whole endpoint behind browser startup. The pool launches drivers once
+    at application startup and hands them out per request instead.
+    """
+
+    def __init__(self, size: int = BROWSER_POOL_SIZE):
+        self.size = size
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=size)
+        self._launched = 0
+
+    async def start(self):
+        """Pre-launch drivers so requests never pay Chrome startup cost"""
+        for _ in range(self.size):
             try:
-                service = ChromeService(ChromeDriverManager().install())
-                driver = webdriver.Chrome(service=service, options=chrome_options)
-                logger.info("Using webdriver-manager for ChromeDriver")
+                driver = await asyncio.to_thread(create_chrome_driver, True)
             except Exception as e:
-                logger.error(f"webdriver-manager failed: {e}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Failed to setup ChromeDriver with webdriver-manager: {str(e)}"
-                )
-        else:
-            # Fallback: Let Selenium try to find ChromeDriver automatically
+                logger.warning(f"Could not pre-launch Chrome driver: {e}")
+                break
+            self._launched += 1
+            await self._queue.put(driver)
+        logger.info(f"Browser pool started with {self._launched} driver(s)")
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow a driver from the pool, launching one lazily if needed"""
+        if self._launched < self.size and self._queue.empty():
+            # Pre-launch failed or hasn't happened yet; launch on demand
+            self._launched += 1
             try:
-                driver = webdriver.Chrome(options=chrome_options)
-                logger.info("Using Selenium's automatic ChromeDriver detection")
-            except Exception as e:
-                logger.error(f"Failed to create Chrome driver: {e}")
-                error_msg = (
-                    "ChromeDriver not found. Solutions:\n"
-                    "1. Install ChromeDriver: apt-get install chromium-chromedriver\n"
-                    "2. Install webdriver-manager: pip install webdriver-manager\n"
-                    "3. Add ChromeDriver to PATH\n"
-                    f"Error: {str(e)}"
-                )
-                raise HTTPException(
-                    status_code=500,
-                    detail=error_msg
-                )
-        
-        logger.info(f"Opening Grokipedia...")
-        driver.get("https://grokipedia.com/")
-        time.sleep(2)
-        
-        logger.info(f"Searching for: {query}")
-        
-        # Find search input and type query
-        search_input = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='text'], input.w-full"))
+                driver = await asyncio.to_thread(create_chrome_driver, True)
+            except Exception:
+                self._launched -= 1
+                raise
+        else:
+            driver = await self._queue.get()
+        try:
+            yield driver
+        finally:
+            await self.release(driver)
+
+    async def release(self, driver):
+        """Reset driver state and return it to the pool"""
+        try:
+            # Clear state between uses so requests don't leak into each other
+            await asyncio.to_thread(self._reset_driver, driver)
+        except Exception as e:
+            logger.warning(f"Driver unhealthy on release ({e}), discarding it")
+            self._launched -= 1
+            await asyncio.to_thread(self._quit_driver, driver)
+            return
+        await self._queue.put(driver)
+
+    @staticmethod
+    def _reset_driver(driver):
+        driver.delete_all_cookies()
+        driver.get("about:blank")
+
+    @staticmethod
+    def _quit_driver(driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Error closing pooled browser: {e}")
+
+    async def shutdown(self):
+        """Quit all pooled drivers"""
+        while not self._queue.empty():
+            driver = self._queue.get_nowait()
+            await asyncio.to_thread(self._quit_driver, driver)
+        self._launched = 0
+        logger.info("Browser pool shut down")
+
+
+browser_pool = BrowserPool()
+
+# Shared Playwright state; one Chromium process serves all requests
+playwright_client = None
+playwright_browser = None
+
+
+async def start_playwright_browser():
+    """Launch the shared Playwright Chromium, reusing the system Chrome"""
+    global playwright_client, playwright_browser
+    if not PLAYWRIGHT_AVAILABLE:
+        return
+    try:
+        playwright_client = await async_playwright().start()
+        playwright_browser = await playwright_client.chromium.launch(
+            headless=True,
+            executable_path=get_chrome_binary_path(),
+            args=['--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu'],
+        )
+        logger.info("Playwright browser started")
+    except Exception as e:
+        logger.warning(f"Could not start Playwright browser ({e}), will use Selenium pool")
+        playwright_client = None
+        playwright_browser = None
+
+
+async def stop_playwright_browser():
+    """Close the shared Playwright browser"""
+    global playwright_client, playwright_browser
+    if playwright_browser:
+        try:
+            await playwright_browser.close()
+        except Exception as e:
+            logger.warning(f"Error closing Playwright browser: {e}")
+        playwright_browser = None
+    if playwright_client:
+        try:
+            await playwright_client.stop()
+        except Exception as e:
+            logger.warning(f"Error stopping Playwright: {e}")
+        playwright_client = None
+
+
+async def scrape_with_playwright(query: str) -> List[str]:
+    """
+    Scrape suggestions with the shared Playwright browser
+
+    Each request gets a throwaway context (cheap: no new process), so
+    many scrapes run concurrently on one Chromium over one websocket.
+
+    Args:
+        query: Search term
+
+    Returns:
+        List of suggestion texts
+    """
+    context = await playwright_browser.new_context(
+        user_agent=GROKIPEDIA_SEARCH_HEADERS["User-Agent"]
+    )
+    try:
+        page = await context.new_page()
+        # Block the same resource classes the Selenium path blocks via CDP
+        await page.route(
+            "**/*",
+            lambda route: route.abort()
+            if route.request.resource_type in ("image", "font", "stylesheet", "media")
+            else route.continue_(),
+        )
+        await page.goto("https://grokipedia.com/", wait_until="domcontentloaded")
+        await page.fill("input[type='text'], input.w-full", query)
+        try:
+            await page.wait_for_selector(SUGGESTION_WAIT_SELECTOR, timeout=3000)
+        except Exception:
+            logger.debug("No suggestion elements appeared within 3s, continuing anyway")
+
+        texts = await page.eval_on_selector_all(
+            COMBINED_SELECTOR,
+            "els => els.map(e => (e.innerText || '').trim()).filter(t => t.length > 2)"
         )
-        search_input.clear()
-        search_input.send_keys(query)
-        
-        # Wait for suggestions to appear
-        logger.info("Waiting for suggestions to appear...")
-        time.sleep(2)
-        
-        # Find all suggestion elements
-        suggestions = []
-        
-        # Try multiple selectors to find suggestions
-        selectors = [
-            "div[class*='cursor-pointer'] span",
-            "div.cursor-pointer span",
-            "[role='option']",
-            "div[class*='search'] div[class*='result']",
-            "div[class*='suggestion']",
-            "div[class*='autocomplete'] span",
-            "ul[class*='suggestions'] li",
-            "div[class*='dropdown'] div"
-        ]
-        
-        for selector in selectors:
+        return list(dict.fromkeys(texts or []))
+    finally:
+        await context.close()
+
+# (query, headless) -> suggestions, evicting by TTL and LRU order. The lock
+# only guards cache bookkeeping, never the scrape itself.
+suggestion_cache = TTLCache(maxsize=SUGGESTION_CACHE_MAXSIZE, ttl=SUGGESTION_CACHE_TTL_SECONDS)
+suggestion_cache_lock = asyncio.Lock()
+
+# Single-flight map: concurrent requests for the same key await one shared
+# task instead of each spawning their own fetch/scrape
+inflight_requests: dict = {}
+
+
+@app.on_event("startup")
+async def startup_event():
+    """Start the shared browser backend so requests never pay Chrome startup"""
+    await start_playwright_browser()
+    if playwright_browser is None:
+        # Only pre-warm the Selenium pool when Playwright isn't serving;
+        # running both would double the browser memory footprint
+        await browser_pool.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Close all browsers"""
+    await stop_playwright_browser()
+    await browser_pool.shutdown()
+
+
+async def scrape_grokipedia_suggestions(query: str, headless: bool = True) -> List[str]:
+    """
+    Search Grokipedia in a browser and get all suggestions that appear
+
+    Headless requests use the shared async Playwright browser when it is
+    running, falling back to a pre-warmed Selenium driver from the pool;
+    non-headless requests get a dedicated driver since pooled ones are
+    launched headless.
+
+    Args:
+        query: Search term
+        headless: Run browser in headless mode (default: True)
+
+    Returns:
+        List of suggestion texts
+    """
+    try:
+        if headless and playwright_browser is not None:
             try:
-                elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                if elements:
-                    logger.info(f"Found {len(elements)} elements with selector: {selector}")
-                    for elem in elements:
-                        text = elem.text.strip()
-                        if text and len(text) > 2 and text not in suggestions:
-                            suggestions.append(text)
-                    if suggestions:
-                        logger.info(f"Successfully extracted {len(suggestions)} suggestions using selector: {selector}")
-                        break
+                return await scrape_with_playwright(query)
             except Exception as e:
-                logger.debug(f"Selector {selector} failed: {e}")
-                continue
-        
-        # If no suggestions found, try to get any visible text elements
-        if not suggestions:
-            logger.warning("No suggestions found with standard selectors, trying alternative approach...")
+                logger.warning(f"Playwright scrape failed ({e}), falling back to Selenium")
+
+        if headless:
+            async with browser_pool.acquire() as driver:
+                # Selenium is synchronous; run it in a worker thread so the
+                # event loop (and /health) stays responsive during the scrape
+                return await asyncio.to_thread(collect_suggestions, driver, query)
+
+        # Non-headless mode can't reuse the headless pool; launch a one-off driver
+        driver = await asyncio.to_thread(create_chrome_driver, False)
+        try:
+            return await asyncio.to_thread(collect_suggestions, driver, query)
+        finally:
             try:
-                # Look for any divs or spans that might contain suggestions
-                all_elements = driver.find_elements(By.CSS_SELECTOR, "div, span, li")
-                for elem in all_elements:
-                    text = elem.text.strip()
-                    # Filter for likely suggestions (not too long, contains query)
-                    if (text and 
-                        2 < len(text) < 200 and 
-                        query.lower() in text.lower() and 
-                        text not in suggestions and
-                        text != query):
-                        suggestions.append(text)
-                        if len(suggestions) >= 10:  # Limit to 10 suggestions
-                            break
+                await asyncio.to_thread(driver.quit)
+                logger.info("Browser closed successfully")
             except Exception as e:
-                logger.error(f"Alternative approach failed: {e}")
-        
-        return suggestions
-        
+                logger.warning(f"Error closing browser: {e}")
+
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting suggestions: {str(e)}")
         raise HTTPException(
             status_code=500,
             detail=f"Failed to get suggestions: {str(e)}"
         )
-    
-    finally:
-        if driver:
-            try:
-                driver.quit()
-                logger.info("Browser closed successfully")
-            except Exception as e:
-                logger.warning(f"Error closing browser: {e}")
+
+
+def collect_suggestions(driver, query: str) -> List[str]:
+    """
+    Drive the Grokipedia search box and collect the suggestions that appear
+
+    Args:
+        driver: A Chrome WebDriver instance
+        query: Search term
+
+    Returns:
+        List of suggestion texts
+    """
+    logger.info(f"Opening Grokipedia...")
+    driver.get("https://grokipedia.com/")
+
+    logger.info(f"Searching for: {query}")
+
+    # Find search input and type query (waiting on presence instead of sleeping)
+    search_input = WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='text'], input.w-full"))
+    )
+    search_input.clear()
+    search_input.send_keys(query)
+
+    # Wait for suggestions to appear; they typically render in 200-500 ms,
+    # so an event-driven wait beats a flat sleep. Bounded so slow pages
+    # still fall through to the selector loop below.
+    logger.info("Waiting for suggestions to appear...")
+    try:
+        WebDriverWait(driver, 3).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, SUGGESTION_WAIT_SELECTOR))
+        )
+    except Exception:
+        logger.debug("No suggestion elements appeared within 3s, continuing anyway")
+
+    # Find all suggestion elements
+    suggestions = []
+
+    try:
+        # One execute_script round-trip returns every matching text at once;
+        # reading elem.text per element would cost one HTTP call each
+        texts = driver.execute_script(
+            "return Array.from(document.querySelectorAll(arguments[0]))"
+            ".map(e => (e.innerText || '').trim())"
+            ".filter(t => t.length > 2);",
+            COMBINED_SELECTOR
+        )
+        # dict.fromkeys dedupes while preserving first-seen order
+        suggestions = list(dict.fromkeys(texts or []))
+        if suggestions:
+            logger.info(f"Successfully extracted {len(suggestions)} suggestions")
+    except Exception as e:
+        logger.debug(f"Combined selector lookup failed: {e}")
+
+    # If no suggestions found, try to get any visible text elements
+    if not suggestions:
+        logger.warning("No suggestions found with standard selectors, trying alternative approach...")
+        try:
+            # Scan every div/span/li in one execute_script round-trip; the
+            # per-element .text approach cost one ChromeDriver HTTP call each
+            # and could take seconds on a page with thousands of elements
+            texts = driver.execute_script(
+                "const q = arguments[0].toLowerCase();"
+                "return Array.from(document.querySelectorAll('div, span, li'))"
+                ".map(e => (e.innerText || '').trim())"
+                ".filter(t => t.length > 2 && t.length < 200"
+                " && t.toLowerCase().includes(q) && t !== arguments[0])"
+                ".slice(0, 10);",
+                query
+            )
+            suggestions = list(dict.fromkeys(texts or []))
+        except Exception as e:
+            logger.error(f"Alternative approach failed: {e}")
+
+    return suggestions
 
 
 @app.get("/")
@@ -269,48 +684,77 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "/suggestions": "POST - Get search suggestions for a query (requires JSON body)",
+            "/suggestions/stream": "GET - Stream suggestions for a query as Server-Sent Events",
             "/health": "GET - Health check"
         }
     }
 
 
 @app.post("/suggestions", response_model=SuggestionResponse)
-async def get_suggestions(request: SuggestionRequest):
+async def get_suggestions(request: SuggestionRequest, response: Response):
     """
     Get autocomplete suggestions from Grokipedia search
-    
+
     Request Body (JSON):
     {
         "query": "search term",
         "headless": true  // optional, default: true
     }
-    
+
     Returns:
         JSON response with suggestions list
     """
     try:
         query = request.query
         headless = request.headless if request.headless is not None else True
-        
+
         logger.info(f"Received request for suggestions: query='{query}', headless={headless}")
-        
+
         if not query or not query.strip():
             raise HTTPException(
                 status_code=400,
                 detail="Query field is required and cannot be empty"
             )
-        
-        suggestions = get_grokipedia_suggestions(query.strip(), headless=headless)
-        
+
+        # Let upstream CDNs cache as long as we do
+        response.headers["Cache-Control"] = f"public, max-age={SUGGESTION_CACHE_TTL_SECONDS}"
+
+        cache_key = (query.strip().lower(), headless)
+        async with suggestion_cache_lock:
+            cached = suggestion_cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"Cache hit for query: {query}")
+            return SuggestionResponse(
+                query=query.strip(),
+                suggestions=cached,
+                count=len(cached),
+                status="success"
+            )
+
+        # Coalesce concurrent identical queries onto one in-flight task
+        task = inflight_requests.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(
+                get_grokipedia_suggestions(query.strip(), headless=headless)
+            )
+            inflight_requests[cache_key] = task
+            task.add_done_callback(lambda t, key=cache_key: inflight_requests.pop(key, None))
+        else:
+            logger.info(f"Joining in-flight request for query: {query}")
+        suggestions = await task
+
+        async with suggestion_cache_lock:
+            suggestion_cache[cache_key] = suggestions
+
         logger.info(f"Successfully retrieved {len(suggestions)} suggestions for query: {query}")
-        
+
         return SuggestionResponse(
             query=query.strip(),
             suggestions=suggestions,
             count=len(suggestions),
             status="success"
         )
-        
+
     except HTTPException:
         raise
     except Exception as e:
@@ -321,6 +765,58 @@ async def get_suggestions(request: SuggestionRequest):
         )
 
 
+@app.get("/suggestions/stream")
+async def stream_suggestions(query: str, headless: bool = True):
+    """
+    Stream autocomplete suggestions as Server-Sent Events
+
+    Each suggestion is pushed as its own `data:` event as soon as it is
+    available, so clients can render progressively instead of waiting for
+    the full JSON blob; a final `event: done` carries the total count.
+
+    Query Parameters:
+        query: search term (required)
+        headless: run the browser fallback headless (optional, default: true)
+    """
+    if not query or not query.strip():
+        raise HTTPException(
+            status_code=400,
+            detail="Query parameter is required and cannot be empty"
+        )
+
+    logger.info(f"Received stream request for suggestions: query='{query}', headless={headless}")
+
+    async def event_stream():
+        try:
+            cache_key = (query.strip().lower(), headless)
+            async with suggestion_cache_lock:
+                suggestions = suggestion_cache.get(cache_key)
+
+            if suggestions is None:
+                # Share in-flight work with /suggestions requests for the same key
+                task = inflight_requests.get(cache_key)
+                if task is None:
+                    task = asyncio.create_task(
+                        get_grokipedia_suggestions(query.strip(), headless=headless)
+                    )
+                    inflight_requests[cache_key] = task
+                    task.add_done_callback(
+                        lambda t, key=cache_key: inflight_requests.pop(key, None)
+                    )
+                suggestions = await task
+                async with suggestion_cache_lock:
+                    suggestion_cache[cache_key] = suggestions
+
+            for suggestion in suggestions:
+                yield f"data: {json.dumps(suggestion)}\n\n"
+            yield f"event: done\ndata: {json.dumps({'count': len(suggestions)})}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming suggestions: {str(e)}")
+            yield f"event: error\ndata: {json.dumps(str(e))}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
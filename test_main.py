@@ -0,0 +1,8 @@
+"""Smoke test: the app module imports and exposes all expected routes"""
+
+import main
+
+
+def test_app_routes():
+    paths = {route.path for route in main.app.routes}
+    assert {"/", "/suggestions", "/suggestions/stream", "/health"} <= paths